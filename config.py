@@ -10,4 +10,14 @@ OPENROUTER_TITLE = "testMcp"
 # Model Configuration
 LLM_MODEL = "openai/gpt-4o-mini"
 LLM_MAX_TOKENS = 250
-LLM_TEMPERATURE = 0.2
\ No newline at end of file
+LLM_TEMPERATURE = 0.2
+
+# MCP Server Configuration
+# Each entry maps a server name to the command used to launch it over stdio.
+MCP_SERVERS = {
+    "bmi": {"command": "python", "args": ["bmi-server.py"]},
+    "weather": {"command": "python", "args": ["weather.py"]},
+}
+# Seconds to wait for a server to list its tools, and before retrying a failure
+MCP_DISCOVERY_TIMEOUT = 10.0
+MCP_DISCOVERY_RETRY_SECONDS = 30.0
\ No newline at end of file
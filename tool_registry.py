@@ -0,0 +1,133 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+
+
+class ToolRegistry:
+    """
+    Discover tools from the configured MCP servers once and cache the catalog.
+
+    A server's cached tools are dropped when it sends a tool-list-changed
+    notification and are rediscovered on the next refresh. Sessions are only
+    open during discovery and tool calls, so a notification sent while no
+    session is open is missed; call invalidate() to force rediscovery. A
+    server that fails or times out during discovery contributes no tools and
+    is retried once retry_delay seconds have passed.
+    Tool names are resolved to their server through a prebuilt dispatch index.
+    """
+
+    def __init__(
+        self,
+        servers: dict[str, dict],
+        discovery_timeout: float = 10.0,
+        retry_delay: float = 30.0,
+    ):
+        self._servers = {
+            name: StdioServerParameters(**spec) for name, spec in servers.items()
+        }
+        self._catalog: dict[str, list[types.Tool]] = {}
+        self._index: dict[str, str] = {}
+        self._stale: set[str] = set(self._servers)
+        self._retry_at: dict[str, float] = {}
+        self._discovery_timeout = discovery_timeout
+        self._retry_delay = retry_delay
+        self._refresh_lock = asyncio.Lock()
+
+    def invalidate(self, server_name: str | None = None):
+        """Mark one server (or every server) for rediscovery on the next refresh."""
+        if server_name is None:
+            self._stale.update(self._servers)
+            self._retry_at.clear()
+        else:
+            self._stale.add(server_name)
+            self._retry_at.pop(server_name, None)
+
+    def _message_handler(self, server_name: str):
+        async def handle_message(message):
+            if isinstance(message, types.ServerNotification) and isinstance(
+                message.root, types.ToolListChangedNotification
+            ):
+                print(f"Tool list changed on server: {server_name}")
+                self.invalidate(server_name)
+
+        return handle_message
+
+    @asynccontextmanager
+    async def open_session(self, server_name: str):
+        """Open an initialized session to a server that reports tool list changes."""
+        async with stdio_client(self._servers[server_name]) as (read, write):
+            async with ClientSession(
+                read, write, message_handler=self._message_handler(server_name)
+            ) as session:
+                await session.initialize()
+                yield session
+
+    async def _discover(self, server_name: str):
+        # Clear the flag first so a tools/list_changed notification received
+        # during discovery leaves the server stale
+        self._stale.discard(server_name)
+        discovered = False
+        try:
+            async with asyncio.timeout(self._discovery_timeout):
+                async with self.open_session(server_name) as session:
+                    tools = await session.list_tools()
+            discovered = True
+        except TimeoutError:
+            print(f"Timed out discovering tools from {server_name}")
+        except Exception as e:
+            print(f"Error discovering tools from {server_name}: {e}")
+        finally:
+            if not discovered:
+                # Keep the server stale, even on cancellation, so it is retried
+                self._stale.add(server_name)
+
+        if not discovered:
+            self._catalog.pop(server_name, None)
+            self._retry_at[server_name] = time.monotonic() + self._retry_delay
+            return
+        self._retry_at.pop(server_name, None)
+        self._catalog[server_name] = tools.tools
+
+    def _build_index(self):
+        index = {}
+        for server_name in self._servers:
+            for tool in self._catalog.get(server_name, []):
+                if tool.name in index:
+                    print(f"Tool {tool.name} on {server_name} is shadowed by {index[tool.name]}")
+                    continue
+                index[tool.name] = server_name
+        self._index = index
+
+    async def refresh(self):
+        """Rediscover tools from stale servers that are not waiting to retry."""
+        if not self._stale:
+            return
+        async with self._refresh_lock:
+            # Another query may have refreshed while this one waited
+            now = time.monotonic()
+            stale = [
+                name
+                for name in self._servers
+                if name in self._stale and self._retry_at.get(name, 0) <= now
+            ]
+            if not stale:
+                return
+            print(f"Discovering tools from servers: {', '.join(stale)}")
+            await asyncio.gather(*(self._discover(name) for name in stale))
+            self._build_index()
+
+    async def get_tools(self) -> list[types.Tool]:
+        """Return every tool across all servers, refreshing stale entries first."""
+        await self.refresh()
+        return [
+            tool
+            for server_name in self._servers
+            for tool in self._catalog.get(server_name, [])
+            if self._index.get(tool.name) == server_name
+        ]
+
+    def resolve(self, tool_name: str) -> str | None:
+        """Return the name of the server that provides a tool, if any."""
+        return self._index.get(tool_name)